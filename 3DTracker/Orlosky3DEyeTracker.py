@@ -7,6 +7,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog
 import sys
 import time
+from collections import deque
 
 try:
     import gl_sphere
@@ -15,25 +16,43 @@ except ImportError:
     GL_SPHERE_AVAILABLE = False
     print("gl_sphere module not found. OpenGL rendering will be disabled.")
 
-ray_lines = [] 
-model_centers = []
 max_rays = 100
+ray_lines = deque(maxlen=max_rays)  # oldest ray drops off automatically once full
+max_model_centers = 200
+model_centers = deque(maxlen=max_model_centers)  # oldest center drops off automatically once full
 prev_model_center_avg = (320,240)
 max_observed_distance = 0  # Initialize adaptive radius
 
+# Fixed camera and projection settings used by the gaze ray projection
+# (computed once instead of on every frame)
+FOV_Y_DEG = 45.0
+FAR_CLIP = 100.0
+CAMERA_POSITION = np.array([0.0, 0.0, 3.0])  # Camera position is fixed at z = 3
+HALF_HEIGHT_FAR = np.tan(np.radians(FOV_Y_DEG) / 2) * FAR_CLIP  # Far plane half height in world units
+
+# Returns True if a camera can be opened at the given index
+def probe_camera(index):
+    cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+    try:
+        return cap.isOpened()
+    finally:
+        # Always release, also for indices that failed to open
+        cap.release()
+
 # Function to detect available cameras
 def detect_cameras(max_cams=10):
-    available_cameras = []
-    for i in range(max_cams):
-        cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-        if cap.isOpened():
-            available_cameras.append(i)
-            cap.release()
-    return available_cameras
+    # Probe one index at a time: the DirectShow/MSMF backends share per-process
+    # device state and per-thread COM setup, so concurrent opens are not safe
+    return [i for i in range(max_cams) if probe_camera(i)]
 
 # Crop the image to maintain a specific aspect ratio (width:height) before resizing.
 def crop_to_aspect_ratio(image, width=640, height=480):
     current_height, current_width = image.shape[:2]
+
+    # Camera already delivers the target size, so there is nothing to crop or resample
+    if current_width == width and current_height == height:
+        return image
+
     desired_ratio = width / height
     current_ratio = current_width / current_height
 
@@ -63,26 +82,27 @@ def get_darkest_area(image):
     searchArea = 20
     internalSkipSize = 5
 
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    min_sum = float('inf')
-    darkest_point = None
-
-    for y in range(ignoreBounds, gray.shape[0] - ignoreBounds, imageSkipSize):
-        for x in range(ignoreBounds, gray.shape[1] - ignoreBounds, imageSkipSize):
-            current_sum = 0
-            num_pixels = 0
-            for dy in range(0, searchArea, internalSkipSize):
-                if y + dy >= gray.shape[0]:
-                    break
-                for dx in range(0, searchArea, internalSkipSize):
-                    if x + dx >= gray.shape[1]:
-                        break
-                    current_sum += gray[y + dy][x + dx]
-                    num_pixels += 1
-
-            if current_sum < min_sum and num_pixels > 0:
-                min_sum = current_sum
-                darkest_point = (x + searchArea // 2, y + searchArea // 2)
+    # (callers that already converted the frame can pass the gray image directly)
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Top-left corners of every sampled block, skipping the image boundaries
+    ys = np.arange(ignoreBounds, gray.shape[0] - ignoreBounds, imageSkipSize)
+    xs = np.arange(ignoreBounds, gray.shape[1] - ignoreBounds, imageSkipSize)
+    if len(ys) == 0 or len(xs) == 0:
+        return None
+
+    # Sparse sample offsets inside a block (ignoreBounds >= searchArea, so blocks never run past the image)
+    offsets = np.arange(0, searchArea, internalSkipSize)
+
+    # Gather every sampled pixel at once as (block y, offset y, block x, offset x) and sum per block
+    rows = (ys[:, None] + offsets).ravel()
+    cols = (xs[:, None] + offsets).ravel()
+    samples = gray[np.ix_(rows, cols)].reshape(len(ys), len(offsets), len(xs), len(offsets))
+    block_sums = samples.sum(axis=(1, 3), dtype=np.int64)
+
+    # argmin picks the first darkest block in row-major order, same as scanning y then x
+    iy, ix = np.unravel_index(np.argmin(block_sums), block_sums.shape)
+    darkest_point = (int(xs[ix]) + searchArea // 2, int(ys[iy]) + searchArea // 2)  # Center of the block
 
     return darkest_point
 
@@ -91,13 +111,15 @@ def mask_outside_square(image, center, size):
     x, y = center
     half_size = size // 2
 
-    mask = np.zeros_like(image)
     top_left_x = max(0, x - half_size)
     top_left_y = max(0, y - half_size)
     bottom_right_x = min(image.shape[1], x + half_size)
     bottom_right_y = min(image.shape[0], y + half_size)
-    mask[top_left_y:bottom_right_y, top_left_x:bottom_right_x] = 255
-    return cv2.bitwise_and(image, mask)
+
+    # Copy the square into a black image rather than building a full-frame mask and ANDing it
+    masked_image = np.zeros_like(image)
+    masked_image[top_left_y:bottom_right_y, top_left_x:bottom_right_x] = image[top_left_y:bottom_right_y, top_left_x:bottom_right_x]
+    return masked_image
 
 def optimize_contours_by_angle(contours, image):
     if len(contours) < 1:
@@ -105,49 +127,34 @@ def optimize_contours_by_angle(contours, image):
 
     # Holds the candidate points
     all_contours = np.concatenate(contours[0], axis=0)
+    num_points = len(all_contours)
 
     # Set spacing based on size of contours
-    spacing = int(len(all_contours)/25)  # Spacing between sampled points
+    spacing = int(num_points/25)  # Spacing between sampled points
 
-    # Temporary array for result
-    filtered_points = []
-    
     # Calculate centroid of the original contours
     centroid = np.mean(all_contours, axis=0)
-    
-    # Create an image of the same size as the original image
-    point_image = image.copy()
-    
-    skip = 0
-    
-    # Loop through each point in the all_contours array
-    for i in range(0, len(all_contours), 1):
-    
-        # Get three points: current point, previous point, and next point
-        current_point = all_contours[i]
-        prev_point = all_contours[i - spacing] if i - spacing >= 0 else all_contours[-spacing]
-        next_point = all_contours[i + spacing] if i + spacing < len(all_contours) else all_contours[spacing]
-        
-        # Calculate vectors between points
-        vec1 = prev_point - current_point
-        vec2 = next_point - current_point
-        
-        with np.errstate(invalid='ignore'):
-            # Calculate angles between vectors
-            angle = np.arccos(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
 
-        
-        # Calculate vector from current point to centroid
-        vec_to_centroid = centroid - current_point
-        
-        # Check if angle is oriented towards centroid
-        # Calculate the cosine of the desired angle threshold (e.g., 80 degrees)
-        cos_threshold = np.cos(np.radians(60))  # Convert angle to radians
-        
-        if np.dot(vec_to_centroid, (vec1+vec2)/2) >= cos_threshold:
-            filtered_points.append(current_point)
-    
-    return np.array(filtered_points, dtype=np.int32).reshape((-1, 1, 2))
+    # Previous and next point for every point at once (wrapping as the per-point loop did)
+    indices = np.arange(num_points)
+    prev_indices = np.where(indices - spacing >= 0, indices - spacing, num_points - spacing)
+    next_indices = np.where(indices + spacing < num_points, indices + spacing, spacing)
+
+    # Calculate vectors between points
+    vec1 = all_contours[prev_indices] - all_contours
+    vec2 = all_contours[next_indices] - all_contours
+
+    # Calculate vector from each point to centroid
+    vec_to_centroid = centroid - all_contours
+
+    # Check if angle is oriented towards centroid
+    # Calculate the cosine of the desired angle threshold (e.g., 80 degrees)
+    cos_threshold = np.cos(np.radians(60))  # Convert angle to radians
+
+    # Row-wise dot product, one pass over all points
+    keep = np.einsum('ij,ij->i', vec_to_centroid, (vec1 + vec2) / 2) >= cos_threshold
+
+    return all_contours[keep].astype(np.int32).reshape((-1, 1, 2))
 
 # Returns the largest contour that is not extremely long or tall
 def filter_contours_by_area_and_return_largest(contours, pixel_thresh, ratio_thresh):
@@ -208,12 +215,12 @@ def check_contour_pixels(contour, image_shape, debug_mode_on):
     overlap_thick = cv2.bitwise_and(contour_mask, ellipse_mask_thick)
     overlap_thin = cv2.bitwise_and(contour_mask, ellipse_mask_thin)
     
-    # Count the number of non-zero (white) pixels in the overlap
-    absolute_pixel_total_thick = np.sum(overlap_thick > 0)#compute with thicker border
-    absolute_pixel_total_thin = np.sum(overlap_thin > 0)#compute with thicker border
+    # Count the number of non-zero (white) pixels in the overlap (countNonZero avoids a temporary bool image)
+    absolute_pixel_total_thick = cv2.countNonZero(overlap_thick)#compute with thicker border
+    absolute_pixel_total_thin = cv2.countNonZero(overlap_thin)#compute with thicker border
     
     # Compute the ratio of pixels under the ellipse to the total pixels on the contour border
-    total_border_pixels = np.sum(contour_mask > 0)
+    total_border_pixels = cv2.countNonZero(contour_mask)
     
     ratio_under_ellipse = absolute_pixel_total_thin / total_border_pixels if total_border_pixels > 0 else 0
     
@@ -237,11 +244,11 @@ def check_ellipse_goodness(binary_image, contour, debug_mode_on):
     # Draw the ellipse on the mask with white color (255)
     cv2.ellipse(mask, ellipse, (255), -1)
     
-    # Calculate the number of pixels within the ellipse
-    ellipse_area = np.sum(mask == 255)
+    # Calculate the number of pixels within the ellipse (mask is only 0 or 255)
+    ellipse_area = cv2.countNonZero(mask)
     
-    # Calculate the number of white pixels within the ellipse
-    covered_pixels = np.sum((binary_image == 255) & (mask == 255))
+    # Calculate the number of white pixels within the ellipse (binary_image is thresholded to 0 or 255)
+    covered_pixels = cv2.countNonZero(cv2.bitwise_and(binary_image, mask))
     
     # Calculate the percentage of covered white pixels within the ellipse
     if ellipse_area == 0:
@@ -266,13 +273,6 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
     global prev_model_center_avg
     global max_observed_distance
 
-    kernel_size = 5
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-
-    dilated_image = cv2.dilate(thresholded_image_medium, kernel, iterations=2)
-    contours, _ = cv2.findContours(dilated_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    reduced_contours = filter_contours_by_area_and_return_largest(contours, 1000, 3)
-
     final_rotated_rect = ((0,0),(0,0),0)
 
     image_array = [thresholded_image_relaxed, thresholded_image_medium, thresholded_image_strict] #holds images
@@ -284,10 +284,8 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
     best_array = 0 
     kernel_size = 5  # Size of the kernel (5x5)
     kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    gray_copy1 = gray_frame.copy()
-    gray_copy2 = gray_frame.copy()
-    gray_copy3 = gray_frame.copy()
-    gray_copies = [gray_copy1, gray_copy2, gray_copy3]
+    # Annotated copies are only ever shown in debug mode, so don't make them otherwise
+    gray_copies = [gray_frame.copy() for _ in range(3)] if debug_mode_on else None
     final_goodness = 0
     
     #iterate through binary images and see which fits the ellipse best
@@ -298,8 +296,6 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
         # Find contours
         contours, hierarchy = cv2.findContours(dilated_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-        # Create an empty image to draw contours
-        contour_img2 = np.zeros_like(dilated_image)
         reduced_contours = filter_contours_by_area_and_return_largest(contours, 1000, 3)
 
         #initialize variables
@@ -315,7 +311,8 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
             #in total pixels, first element is pixel total, next is ratio
             total_pixels = check_contour_pixels(reduced_contours[0], dilated_image.shape, debug_mode_on)                 
             
-            cv2.ellipse(gray_copies[i-1], ellipse, (255, 0, 0), 2)  # Draw with specified color and thickness of 2
+            if debug_mode_on:
+                cv2.ellipse(gray_copies[i-1], ellipse, (255, 0, 0), 2)  # Draw with specified color and thickness of 2
             font = cv2.FONT_HERSHEY_SIMPLEX  # Font type
             
             final_goodness = current_goodness[0]*total_pixels[0]*total_pixels[0]*total_pixels[1]
@@ -327,8 +324,6 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
             final_contours = reduced_contours
             final_image = dilated_image
 
-    test_frame = frame.copy()
-    
     final_contours = [optimize_contours_by_angle(final_contours, gray_frame)]
     
     final_rotated_rect = None
@@ -337,18 +332,14 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
         ellipse = cv2.fitEllipse(final_contours[0])
         final_rotated_rect = ellipse
 
-        # Store the new ray in the list
+        # Store the new ray (the deque keeps only the last `max_rays` elements)
         ray_lines.append(final_rotated_rect)
-        # **Prune rays if list exceeds max_rays**
-        if len(ray_lines) > max_rays:
-            num_to_remove = len(ray_lines) - max_rays
-            ray_lines = ray_lines[num_to_remove:]  # Keep only the last `max_rays` elements
 
     model_center_average = (320,240)
 
     model_center = compute_average_intersection(frame, ray_lines, 5, 1500, 5)
     if model_center is not None:
-        model_center_average = update_and_average_point(model_centers, model_center, 200)
+        model_center_average = update_and_average_point(model_centers, model_center)
 
     if model_center_average[0] == 320:
         model_center_average = prev_model_center_avg
@@ -422,11 +413,13 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
         cv2.putText(frame, origin_text, text_origin2, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
         cv2.putText(frame, dir_text, text_dir2, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
-    if center is not None and direction is not None:
-        print(f"Sphere Center:   ({center[0]:.3f}, {center[1]:.3f}, {center[2]:.3f})")
-        print(f"Gaze Direction:  ({direction[0]:.3f}, {direction[1]:.3f}, {direction[2]:.3f})")
-    else:
-        print("No valid intersection found.")
+    # Per-frame console output is slow enough to cause jitter, so only print in debug mode
+    if debug_mode_on:
+        if center is not None and direction is not None:
+            print(f"Sphere Center:   ({center[0]:.3f}, {center[1]:.3f}, {center[2]:.3f})")
+            print(f"Gaze Direction:  ({direction[0]:.3f}, {direction[1]:.3f}, {direction[2]:.3f})")
+        else:
+            print("No valid intersection found.")
 
     cv2.imshow("Frame with Ellipse and Rays", frame)
 
@@ -437,32 +430,28 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
 
     return final_rotated_rect
 
-def update_and_average_point(point_list, new_point, N):
+def update_and_average_point(point_list, new_point):
     """
-    Adds a new point to the list, keeps only the last N points, 
-    and returns the average of those points.
+    Adds a new point to the list and returns the average of the kept points.
     
     Parameters:
-    - point_list: Global list storing past points [(x1, y1), (x2, y2), ...]
+    - point_list: Global deque(maxlen=N) storing past points [(x1, y1), (x2, y2), ...];
+      its maxlen keeps only the last N points.
     - new_point: Tuple (x, y) representing the new point to add.
-    - N: Maximum number of points to keep in the list.
     
     Returns:
     - (avg_x, avg_y): The average point as a tuple of integers.
     - None if the list is empty.
     """
-    point_list.append(new_point)  # Add new point
-
-    if len(point_list) > N:
-        point_list.pop(0)  # Remove the oldest point to maintain size N
+    point_list.append(new_point)  # Add new point (the oldest drops off once maxlen is reached)
 
     if not point_list:
         return None  # No points available
 
-    avg_x = int(np.mean([p[0] for p in point_list]))
-    avg_y = int(np.mean([p[1] for p in point_list]))
+    # Average both coordinates in a single pass
+    avg_x, avg_y = np.mean(point_list, axis=0)
 
-    return (avg_x, avg_y)
+    return (int(avg_x), int(avg_y))
 
 def draw_orthogonal_ray(image, ellipse, length=100, color=(0, 255, 0), thickness=1):
     """
@@ -494,23 +483,31 @@ def draw_orthogonal_ray(image, ellipse, length=100, color=(0, 255, 0), thickness
 
     return image 
 
-stored_intersections = []  # Stores all past intersections
+# Ring buffer holding the last M intersections (allocated on first use, sized to M)
+stored_intersections = None
+stored_intersections_next = 0  # slot the next intersection is written to
+stored_intersections_count = 0  # number of filled slots
 
 def compute_average_intersection(frame, ray_lines, N, M, spacing):
     """
     Selects N random lines from the list, highlights them in red on the frame,
-    computes their intersections, stores them, and prunes stored intersections when exceeding M.
+    computes their intersections and stores them, keeping only the last M.
 
     Parameters:
     - frame: The OpenCV frame to draw on.
-    - ray_lines: List of ellipse tuples ((cx, cy), (major_axis, minor_axis), angle).
+    - ray_lines: Sequence (list or deque) of ellipse tuples ((cx, cy), (major_axis, minor_axis), angle).
     - N: Number of random lines to select for intersection calculation.
-    - M: Maximum number of stored intersections before pruning.
+    - M: Maximum number of stored intersections (size of the ring buffer).
 
     Returns:
     - (avg_x, avg_y): Average intersection point of selected lines.
     """
-    global stored_intersections
+    global stored_intersections, stored_intersections_next, stored_intersections_count
+
+    if stored_intersections is None or len(stored_intersections) != M:
+        stored_intersections = np.zeros((M, 2))
+        stored_intersections_next = 0
+        stored_intersections_count = 0
 
     if len(ray_lines) < 2 or N < 2:
         return (0, 0)  # Need at least 2 lines to find intersections
@@ -541,39 +538,26 @@ def compute_average_intersection(frame, ray_lines, N, M, spacing):
             # Ensure the intersection is within the frame bounds before adding
             if intersection and (0 <= intersection[0] < width) and (0 <= intersection[1] < height):
                 intersections.append(intersection)
-                stored_intersections.append(intersection)  # Store valid intersections
+                # Store valid intersections, overwriting the oldest once M are stored
+                stored_intersections[stored_intersections_next] = intersection
+                stored_intersections_next = (stored_intersections_next + 1) % M
+                stored_intersections_count = min(stored_intersections_count + 1, M)
         #else:
         #    print(f"Skipped intersection: Angle difference too small ({abs(angle1 - angle2):.2f}°)")
 
-    # Prune intersections if stored list exceeds M
-    if len(stored_intersections) > M:
-        stored_intersections = prune_intersections(stored_intersections, M)
-
     # Draw all stored intersections on the frame
-    #for pt in stored_intersections:
+    #for pt in stored_intersections[:stored_intersections_count]:
     #    cv2.circle(frame, pt, 3, (255, 255, 255), -1)  # White dot for every past intersection
 
     if not intersections:
         return None  # No valid intersections found
 
     # Compute the average intersection point
-    avg_x = np.mean([pt[0] for pt in stored_intersections])
-    avg_y = np.mean([pt[1] for pt in stored_intersections])
+    avg_x, avg_y = stored_intersections[:stored_intersections_count].mean(axis=0)
 
 
     return (int(avg_x), int(avg_y))
 
-#Removes the oldest intersections to ensure only the last M intersections remain.
-def prune_intersections(intersections, maximum_intersections):
-
-    if len(intersections) <= maximum_intersections:
-        return intersections  # No need to prune if within the limit
-
-    # Keep only the last M intersections
-    pruned_intersections = intersections[-maximum_intersections:]
-
-    return pruned_intersections
-
 def find_line_intersection(ellipse1, ellipse2):
     """
     Computes the intersection of two lines that are orthogonal to the surface of given ellipses.
@@ -588,24 +572,25 @@ def find_line_intersection(ellipse1, ellipse2):
     (cx1, cy1), (_, minor_axis1), angle1 = ellipse1
     (cx2, cy2), (_, minor_axis2), angle2 = ellipse2
 
-    # Convert angles to radians
-    angle1_rad = np.deg2rad(angle1)
-    angle2_rad = np.deg2rad(angle2)
+    # Convert angles to radians (scalars, so plain math avoids NumPy call overhead)
+    angle1_rad = math.radians(angle1)
+    angle2_rad = math.radians(angle2)
 
     # Compute direction vectors for the two lines
-    dx1, dy1 = (minor_axis1 / 2) * np.cos(angle1_rad), (minor_axis1 / 2) * np.sin(angle1_rad)
-    dx2, dy2 = (minor_axis2 / 2) * np.cos(angle2_rad), (minor_axis2 / 2) * np.sin(angle2_rad)
+    dx1, dy1 = (minor_axis1 / 2) * math.cos(angle1_rad), (minor_axis1 / 2) * math.sin(angle1_rad)
+    dx2, dy2 = (minor_axis2 / 2) * math.cos(angle2_rad), (minor_axis2 / 2) * math.sin(angle2_rad)
 
     # Line equations in parametric form:
     # (x1, y1) + t1 * (dx1, dy1) = (x2, y2) + t2 * (dx2, dy2)
-    A = np.array([[dx1, -dx2], [dy1, -dy2]])
-    B = np.array([cx2 - cx1, cy2 - cy1])
-
-    # Solve for t1, t2 using linear algebra (if the determinant is nonzero)
-    if np.linalg.det(A) == 0:
+    # i.e. [[dx1, -dx2], [dy1, -dy2]] @ [t1, t2] = [cx2 - cx1, cy2 - cy1]
+    det = dx2 * dy1 - dx1 * dy2
+    if det == 0:
         return None  # Lines are parallel and do not intersect
 
-    t1, t2 = np.linalg.solve(A, B)
+    # Solve the 2x2 system for t1 with Cramer's rule (t2 is not needed)
+    bx = cx2 - cx1
+    by = cy2 - cy1
+    t1 = (dx2 * by - dy2 * bx) / det
 
     # Compute intersection point
     intersection_x = cx1 + t1 * dx1
@@ -624,17 +609,11 @@ def compute_gaze_vector(x, y, center_x, center_y, screen_width=640, screen_heigh
     viewport_width = screen_width
     viewport_height = screen_height
 
-    # Define camera and projection settings
-    fov_y_deg = 45.0
+    # Camera and far plane are fixed, only the width depends on the aspect ratio
     aspect_ratio = viewport_width / viewport_height
-    far_clip = 100.0
-
-    # Camera position is fixed at z = 3
-    camera_position = np.array([0.0, 0.0, 3.0])
-
-    # Compute size of far plane in world units
-    fov_y_rad = np.radians(fov_y_deg)
-    half_height_far = np.tan(fov_y_rad / 2) * far_clip
+    far_clip = FAR_CLIP
+    camera_position = CAMERA_POSITION
+    half_height_far = HALF_HEIGHT_FAR
     half_width_far = half_height_far * aspect_ratio
 
     # Convert screen (x, y) to normalized device coordinates [-1, 1]
@@ -690,20 +669,6 @@ def compute_gaze_vector(x, y, center_x, center_y, screen_width=640, screen_heigh
         if t is None:
             return None, None
 
-    sqrt_disc = np.sqrt(discriminant)
-    t1 = (-b - sqrt_disc) / (2 * a)
-    t2 = (-b + sqrt_disc) / (2 * a)
-
-    t = None
-    if t1 > 0 and t2 > 0:
-        t = min(t1, t2)
-    elif t1 > 0:
-        t = t1
-    elif t2 > 0:
-        t = t2
-    if t is None:
-        return None, None
-
     # Final intersection point
     intersection_point = origin + t * direction
 
@@ -723,7 +688,7 @@ def compute_gaze_vector(x, y, center_x, center_y, screen_width=640, screen_heigh
 
     rotation_axis /= rotation_axis_norm
     dot = np.dot(circle_local_center, target_direction)
-    dot = np.clip(dot, -1.0, 1.0)
+    dot = max(-1.0, min(1.0, dot))
     angle_rad = np.arccos(dot)
 
     # Rotation matrix from axis-angle
@@ -746,23 +711,16 @@ def compute_gaze_vector(x, y, center_x, center_y, screen_width=640, screen_heigh
     # Write to file (overwrite every frame)
     file_path = "gaze_vector.txt"
 
-    def is_file_available(path):
-        try:
-            with open(path, "a"):
-                return True
-        except IOError:
-            return False
-
-    if is_file_available(file_path):
-        try:
-            with open(file_path, "w") as f:
-                all_values = np.concatenate((sphere_center, gaze_rotated))
-                csv_line = ",".join(f"{v:.6f}" for v in all_values)
-                f.write(csv_line + "\n")
-        except Exception as e:
-            print("Write error:", e)
-    else:
+    # Open once; a locked/unavailable file raises here instead of needing a separate probe open
+    try:
+        with open(file_path, "w") as f:
+            all_values = np.concatenate((sphere_center, gaze_rotated))
+            csv_line = ",".join(f"{v:.6f}" for v in all_values)
+            f.write(csv_line + "\n")
+    except IOError:
         print("File is currently in use. Skipping write.")
+    except Exception as e:
+        print("Write error:", e)
 
     return sphere_center, gaze_rotated
 
@@ -772,11 +730,12 @@ def process_frame(frame):
     # Crop and resize frame
     frame = crop_to_aspect_ratio(frame)
 
+    # Convert to grayscale once, used for both the darkest point search and thresholding
+    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
     #find the darkest point
-    darkest_point = get_darkest_area(frame)
+    darkest_point = get_darkest_area(gray_frame)
 
-    # Convert to grayscale to handle pixel value operations
-    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     darkest_pixel_value = gray_frame[darkest_point[1], darkest_point[0]]
     
     # apply thresholding operations at different levels
@@ -825,6 +784,15 @@ def process_camera():
     cap.release()
     cv2.destroyAllWindows()
 
+# Opens a video file with the FFmpeg backend, asking for hardware-accelerated decoding
+# when this OpenCV build supports it; falls back to the default backend otherwise
+def open_video_file(video_path):
+    if hasattr(cv2, "VIDEO_ACCELERATION_ANY"):
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap.isOpened():
+            return cap
+    return cv2.VideoCapture(video_path)
+
 # Process a selected video file
 def process_video():
     video_path = filedialog.askopenfilename(filetypes=[("Video Files", "*.mp4;*.avi")])
@@ -832,7 +800,7 @@ def process_video():
     if not video_path:
         return  # User canceled selection
 
-    cap = cv2.VideoCapture(video_path)
+    cap = open_video_file(video_path)
 
     if not cap.isOpened():
         print("Error: Could not open video file.")
@@ -14,6 +14,13 @@ sphere_widget = None
 CV_pupil_x = 0
 CV_pupil_y = 0
 
+# Fixed camera and projection settings used by the gaze ray projection
+# (computed once instead of on every frame)
+FOV_Y_DEG = 45.0
+FAR_CLIP = 100.0
+CAMERA_POSITION = np.array([0.0, 0.0, 3.0])  # Camera position is fixed at z = 3
+HALF_HEIGHT_FAR = np.tan(np.radians(FOV_Y_DEG) / 2) * FAR_CLIP  # Far plane half height in world units
+
 class SphereWidget(QOpenGLWidget):
     def __init__(self):
         super().__init__()
@@ -24,6 +31,7 @@ class SphereWidget(QOpenGLWidget):
         self.rot_x, self.rot_y = 0, 0
         self.sphere_vertices, self.sphere_indices = self.generate_wireframe_sphere(30, 30)
         self.circle_vertices = self.generate_circle_on_sphere(r_sphere=1.0, r_circle=0.2, num_segments=100)
+        self.unit_circles = {}  # cached 2D unit circle points per segment count
         self.camera_position = np.array([0.0, 0.0, -3.0])
         self.ray_origin = None
         self.ray_direction = None
@@ -48,15 +56,20 @@ class SphereWidget(QOpenGLWidget):
         # Flip y because OpenGL's 0,0 is bottom-left, but PyQt uses top-left
         y_flipped = h - y
 
+        # Unit circle is computed once per segment count, then scaled and offset
+        unit_circle = self.unit_circles.get(segments)
+        if unit_circle is None:
+            angles = 2 * np.pi * np.arange(segments) / segments
+            unit_circle = np.column_stack((np.cos(angles), np.sin(angles))).astype(np.float32)
+            self.unit_circles[segments] = unit_circle
+        points = unit_circle * radius + np.array([x, y_flipped], dtype=np.float32)
+
         glColor3f(1.0, 1.0, 0.0)  # Yellow circle
         glLineWidth(2.0)
-        glBegin(GL_LINE_LOOP)
-        for i in range(segments):
-            angle = 2 * np.pi * i / segments
-            cx = x + np.cos(angle) * radius
-            cy = y_flipped + np.sin(angle) * radius
-            glVertex2f(cx, cy)
-        glEnd()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, points)
+        glDrawArrays(GL_LINE_LOOP, 0, segments)
+        glDisableClientState(GL_VERTEX_ARRAY)
 
         glPopMatrix()
         glMatrixMode(GL_PROJECTION)
@@ -82,7 +95,7 @@ class SphereWidget(QOpenGLWidget):
                 p2 = p1 + lon_div + 1
                 indices.append((p1, p2))
                 indices.append((p1, p1 + 1))
-        return np.array(vertices, dtype=np.float32), np.array(indices, dtype=np.int32)
+        return np.array(vertices, dtype=np.float32), np.array(indices, dtype=np.uint32)
 
     #create bisecting circle
     def generate_circle_on_sphere(self, r_sphere=1.0, r_circle=0.8, num_segments=100):
@@ -103,6 +116,8 @@ class SphereWidget(QOpenGLWidget):
     def initializeGL(self):
         glEnable(GL_DEPTH_TEST)
         glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
+        # Quadric for the intersection marker, created once and reused every paint
+        self.marker_quadric = gluNewQuadric()
 
     def resizeGL(self, w, h):
         glViewport(0, 0, w, h)
@@ -169,16 +184,13 @@ class SphereWidget(QOpenGLWidget):
                     t = t1
                 elif t2 > 0:
                     t = t2
-                print(t)
                 if t is not None:
                     intersection = origin + t * direction
-                    print(discriminant)
                     # Draw small red sphere at intersection
                     glPushMatrix()
                     glColor3f(1.0, 1.0, 1.0)  # white marker
                     glTranslatef(intersection[0], intersection[1], intersection[2])
-                    quad = gluNewQuadric()
-                    gluSphere(quad, 0.02, 10, 10)
+                    gluSphere(self.marker_quadric, 0.02, 10, 10)
                     glPopMatrix()
 
         glPushMatrix()
@@ -186,13 +198,13 @@ class SphereWidget(QOpenGLWidget):
         glRotatef(self.sphere_rot_x, 1, 0, 0)
         glRotatef(self.sphere_rot_y, 0, 1, 0)
 
+        # Draw the wireframe from vertex arrays in one call instead of one glVertex per point
         glColor3f(0.3, 0.3, 0.8)
         glLineWidth(1.5)
-        glBegin(GL_LINES)
-        for i1, i2 in self.sphere_indices:
-            glVertex3fv(self.sphere_vertices[i1])
-            glVertex3fv(self.sphere_vertices[i2])
-        glEnd()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.sphere_vertices)
+        glDrawElements(GL_LINES, self.sphere_indices.size, GL_UNSIGNED_INT, self.sphere_indices)
+        glDisableClientState(GL_VERTEX_ARRAY)
 
         glColor3f(1.0, 0.0, 0.0)
         glLineWidth(2.0)
@@ -209,10 +221,10 @@ class SphereWidget(QOpenGLWidget):
 
         glColor3f(0.0, 1.0, 0.0)
         glLineWidth(3.0)
-        glBegin(GL_LINE_LOOP)
-        for vertex in self.circle_vertices:
-            glVertex3fv(vertex)
-        glEnd()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, self.circle_vertices)
+        glDrawArrays(GL_LINE_LOOP, 0, len(self.circle_vertices))
+        glDisableClientState(GL_VERTEX_ARRAY)
 
         self.draw_2d_circle(CV_pupil_x, CV_pupil_y)
 
@@ -249,17 +261,11 @@ def update_sphere_rotation(x, y, center_x, center_y, screen_width=640, screen_he
     viewport_width = screen_width
     viewport_height = screen_height
 
-    # Define camera and projection settings
-    fov_y_deg = 45.0
+    # Camera and far plane are fixed, only the width depends on the aspect ratio
     aspect_ratio = viewport_width / viewport_height
-    far_clip = 100.0
-
-    # Camera position is fixed at z = 3
-    camera_position = np.array([0.0, 0.0, 3.0])
-
-    # Compute size of far plane in world units
-    fov_y_rad = np.radians(fov_y_deg)
-    half_height_far = np.tan(fov_y_rad / 2) * far_clip
+    far_clip = FAR_CLIP
+    camera_position = CAMERA_POSITION
+    half_height_far = HALF_HEIGHT_FAR
     half_width_far = half_height_far * aspect_ratio
 
     # Convert screen (x, y) to normalized device coordinates [-1, 1]
@@ -341,7 +347,7 @@ def update_sphere_rotation(x, y, center_x, center_y, screen_width=640, screen_he
 
     rotation_axis /= rotation_axis_norm
     dot = np.dot(circle_local_center, target_direction)
-    dot = np.clip(dot, -1.0, 1.0)
+    dot = max(-1.0, min(1.0, dot))
     angle_rad = np.arccos(dot)
 
     # Build rotation matrix from axis-angle
@@ -391,7 +397,8 @@ def update_sphere_rotation(x, y, center_x, center_y, screen_width=640, screen_he
     w = sphere_widget.width()
     h = sphere_widget.height()
     glReadBuffer(GL_FRONT)
-    pixels = glReadPixels(0, 0, w, h, GL_RGB, GL_UNSIGNED_BYTE)
+    # Read back in BGR so the image can be blended straight onto OpenCV frames
+    pixels = glReadPixels(0, 0, w, h, GL_BGR, GL_UNSIGNED_BYTE)
     image = np.frombuffer(pixels, dtype=np.uint8).reshape((h, w, 3))
     image = np.flipud(image)
 
@@ -22,14 +22,20 @@ class CursorOverlay(QtWidgets.QWidget):
         self.label = QtWidgets.QLabel(self)
         self.label.setGeometry(0, 0, self.diameter, self.diameter)
 
+        # The ring never changes, so render it into the label once
+        self.draw_circle()
+        self.last_position = None
+
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update_position)
         self.timer.start(10)
 
     def update_position(self):
         x, y = pyautogui.position()
-        self.move(x - self.radius, y - self.radius)
-        self.draw_circle()
+        # Only move the window when the cursor actually moved since the last tick
+        if (x, y) != self.last_position:
+            self.move(x - self.radius, y - self.radius)
+            self.last_position = (x, y)
 
     def draw_circle(self):
         # Create transparent OpenCV image
@@ -38,10 +44,11 @@ class CursorOverlay(QtWidgets.QWidget):
         # Draw light green ring
         cv2.circle(img, (self.radius + 2, self.radius + 2), self.radius -5, (0, 255, 0, 255), 10)
 
-        # Convert to Qt image
+        # Convert to Qt image (keep the buffer alive, QImage does not own it)
+        self.ring_image = img
         qimg = QtGui.QImage(img.data, self.diameter, self.diameter, QtGui.QImage.Format_RGBA8888)
-        pixmap = QtGui.QPixmap.fromImage(qimg)
-        self.label.setPixmap(pixmap)
+        self.ring_pixmap = QtGui.QPixmap.fromImage(qimg)
+        self.label.setPixmap(self.ring_pixmap)
 
 app = QtWidgets.QApplication(sys.argv)
 overlay = CursorOverlay(radius=80)
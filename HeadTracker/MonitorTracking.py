@@ -14,15 +14,25 @@ CENTER_X = MONITOR_WIDTH // 2
 CENTER_Y = MONITOR_HEIGHT // 2
 mouse_control_enabled = True
 filter_length = 8
+print_screen_position = False  # per-frame console output, enable only when debugging
 
+# Degrees at which the screen border will be reached
+YAW_DEGREES = 20  # x degrees left or right
+PITCH_DEGREES = 10  # x degrees up or down
 
-FACE_OUTLINE_INDICES = [
+# Pixels per degree, fixed for the session so computed once
+SCREEN_SCALE_X = MONITOR_WIDTH / (2 * YAW_DEGREES)
+SCREEN_SCALE_Y = MONITOR_HEIGHT / (2 * PITCH_DEGREES)
+
+
+# frozenset so the per-landmark membership test is O(1) instead of a list scan
+FACE_OUTLINE_INDICES = frozenset([
     10, 338, 297, 332, 284, 251, 389, 356,
     454, 323, 361, 288, 397, 365, 379, 378,
     400, 377, 152, 148, 176, 149, 150, 136,
     172, 58, 132, 93, 234, 127, 162, 21,
     54, 103, 67, 109
-]
+])
 
 
 # Shared mouse target position
@@ -56,19 +66,41 @@ LANDMARKS = {
     "front": 1,
 }
 
+# Wireframe cube edges (corner index pairs), constant so built once
+CUBE_EDGES = (
+    (0, 1), (1, 2), (2, 3), (3, 0),  # front face
+    (4, 5), (5, 6), (6, 7), (7, 4),  # back face
+    (0, 4), (1, 5), (2, 6), (3, 7)   # sides
+)
+
 def mouse_mover():
     while True:
         if mouse_control_enabled == True:
             with mouse_lock:
                 x, y = mouse_target
-            pyautogui.moveTo(x, y)
+            # Only call moveTo when the cursor is not already at the target; comparing against the
+            # real cursor position (not the last target sent) also re-applies the target after
+            # F7 re-enables control or the mouse was moved by hand
+            if tuple(pyautogui.position()) != (x, y):
+                pyautogui.moveTo(x, y)
         time.sleep(0.01)  # adjust for responsiveness
 
+def toggle_mouse_control():
+    # F7 hotkey callback, runs on the keyboard hook thread instead of polling every frame
+    global mouse_control_enabled
+    mouse_control_enabled = not mouse_control_enabled
+    print(f"[Mouse Control] {'Enabled' if mouse_control_enabled else 'Disabled'}")
+
 def landmark_to_np(landmark, w, h):
     return np.array([landmark.x * w, landmark.y * h, landmark.z * w])
 
 threading.Thread(target=mouse_mover, daemon=True).start()
 
+# Toggle mouse control once per F7 press (fires on release, so holding the key does not repeat)
+keyboard.add_hotkey('f7', toggle_mouse_control, trigger_on_release=True)
+
+landmarks_frame = None
+
 while cap.isOpened():
     ret, frame = cap.read()
     if not ret:
@@ -80,16 +112,21 @@ while cap.isOpened():
 
     if results.multi_face_landmarks:
         face_landmarks = results.multi_face_landmarks[0].landmark
-        landmarks_frame = np.zeros_like(frame)  # Blank black frame
+        # Blank black frame, reused and cleared instead of reallocated every frame
+        if landmarks_frame is None or landmarks_frame.shape != frame.shape:
+            landmarks_frame = np.zeros_like(frame)
+        else:
+            landmarks_frame.fill(0)
 
-        outline_pts = []
         # Draw all landmarks as single white pixels
+        # (only x, y are needed here, so skip building a 3D array per landmark; bind lookups once)
+        outline_indices = FACE_OUTLINE_INDICES
+        draw_circle = cv2.circle
         for i, landmark in enumerate(face_landmarks):
-            pt = landmark_to_np(landmark, w, h)
-            x, y = int(pt[0]), int(pt[1])
+            x, y = int(landmark.x * w), int(landmark.y * h)
             if 0 <= x < w and 0 <= y < h:
-                color = (155, 155, 155) if i in FACE_OUTLINE_INDICES else (255, 25, 10)
-                cv2.circle(landmarks_frame, (x, y), 3, color, -1)
+                color = (155, 155, 155) if i in outline_indices else (255, 25, 10)
+                draw_circle(landmarks_frame, (x, y), 3, color, -1)
                 frame[y, x] = (255, 255, 255)  # optional: also update main frame if needed
 
         
@@ -154,12 +191,7 @@ while cap.isOpened():
 
         # Draw wireframe cube
         cube_corners_2d = [project(pt) for pt in cube_corners]
-        edges = [
-            (0, 1), (1, 2), (2, 3), (3, 0),  # front face
-            (4, 5), (5, 6), (6, 7), (7, 4),  # back face
-            (0, 4), (1, 5), (2, 6), (3, 7)   # sides
-        ]
-        for i, j in edges:
+        for i, j in CUBE_EDGES:
             cv2.line(frame, cube_corners_2d[i], cube_corners_2d[j], (255, 125, 35), 2)
 
         # Update smoothing buffers
@@ -177,14 +209,14 @@ while cap.isOpened():
         # Horizontal (yaw) angle from reference (project onto XZ plane)
         xz_proj = np.array([avg_direction[0], 0, avg_direction[2]])
         xz_proj /= np.linalg.norm(xz_proj)
-        yaw_rad = math.acos(np.clip(np.dot(reference_forward, xz_proj), -1.0, 1.0))
+        yaw_rad = math.acos(max(-1.0, min(1.0, np.dot(reference_forward, xz_proj))))
         if avg_direction[0] < 0:
             yaw_rad = -yaw_rad  # left is negative
 
         # Vertical (pitch) angle from reference (project onto YZ plane)
         yz_proj = np.array([0, avg_direction[1], avg_direction[2]])
         yz_proj /= np.linalg.norm(yz_proj)
-        pitch_rad = math.acos(np.clip(np.dot(reference_forward, yz_proj), -1.0, 1.0))
+        pitch_rad = math.acos(max(-1.0, min(1.0, np.dot(reference_forward, yz_proj))))
         if avg_direction[1] > 0:
             pitch_rad = -pitch_rad  # up is positive
 
@@ -212,10 +244,6 @@ while cap.isOpened():
         #pitch is now converted to 90 (looking straight down) and 270 (looking straight up), wrt camera
         #print(f"Angles: yaw={yaw_deg}, pitch={pitch_deg}")
 
-        #specify degrees at which screen border will be reached
-        yawDegrees = 20 # x degrees left or right
-        pitchDegrees = 10 # x degrees up or down
-        
         # leftmost pixel position must correspond to 180 - yaw degrees
         # rightmost pixel position must correspond to 180 + yaw degrees
         # topmost pixel position must correspond to 180 + pitch degrees
@@ -226,20 +254,15 @@ while cap.isOpened():
         pitch_deg += calibration_offset_pitch
 
         # Map to full screen resolution
-        screen_x = int(((yaw_deg - (180 - yawDegrees)) / (2 * yawDegrees)) * MONITOR_WIDTH)
-        screen_y = int(((180 + pitchDegrees - pitch_deg) / (2 * pitchDegrees)) * MONITOR_HEIGHT)
+        screen_x = int((yaw_deg - (180 - YAW_DEGREES)) * SCREEN_SCALE_X)
+        screen_y = int((180 + PITCH_DEGREES - pitch_deg) * SCREEN_SCALE_Y)
 
         # Clamp screen position to monitor bounds
-        if(screen_x < 10):
-            screen_x = 10
-        if(screen_y < 10):
-            screen_y = 10
-        if(screen_x > MONITOR_WIDTH - 10):
-            screen_x = MONITOR_WIDTH - 10
-        if(screen_y > MONITOR_HEIGHT - 10):
-            screen_y = MONITOR_HEIGHT - 10
+        screen_x = max(10, min(screen_x, MONITOR_WIDTH - 10))
+        screen_y = max(10, min(screen_y, MONITOR_HEIGHT - 10))
 
-        print(f"Screen position: x={screen_x}, y={screen_y}")
+        if print_screen_position:
+            print(f"Screen position: x={screen_x}, y={screen_y}")
 
         if mouse_control_enabled:
             with mouse_lock:
@@ -257,12 +280,6 @@ while cap.isOpened():
     cv2.imshow("Head-Aligned Cube", frame)
     cv2.imshow("Facial Landmarks", landmarks_frame)
 
-    if keyboard.is_pressed('f7'):
-        mouse_control_enabled = not mouse_control_enabled
-        print(f"[Mouse Control] {'Enabled' if mouse_control_enabled else 'Disabled'}")
-        time.sleep(0.3)  # debounce to prevent rapid toggling
-
-
     key = cv2.waitKey(1) & 0xFF
     if key == ord('q'):
         break
@@ -12,6 +12,11 @@ def crop_to_aspect_ratio(image, width=640, height=480):
     
     # Calculate current aspect ratio
     current_height, current_width = image.shape[:2]
+
+    # Camera already delivers the target size, so there is nothing to crop or resample
+    if current_width == width and current_height == height:
+        return image
+
     desired_ratio = width / height
     current_ratio = current_width / current_height
 
@@ -48,30 +53,27 @@ def get_darkest_area(image):
     internalSkipSize = 5 #skip every Nth x and y pixel in the local search area (sparse sampling)
     
     # Convert to grayscale
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-    min_sum = float('inf')
-    darkest_point = None
-
-    # Loop over the image with spacing defined by imageSkipSize, ignoring the boundaries
-    for y in range(ignoreBounds, gray.shape[0] - ignoreBounds, imageSkipSize):
-        for x in range(ignoreBounds, gray.shape[1] - ignoreBounds, imageSkipSize):
-            # Calculate sum of pixel values in the search area, skipping pixels based on internalSkipSize
-            current_sum = np.int64(0)
-            num_pixels = 0
-            for dy in range(0, searchArea, internalSkipSize):
-                if y + dy >= gray.shape[0]:
-                    break
-                for dx in range(0, searchArea, internalSkipSize):
-                    if x + dx >= gray.shape[1]:
-                        break
-                    current_sum += gray[y + dy][x + dx]
-                    num_pixels += 1
+    # (callers that already converted the frame can pass the gray image directly)
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Top-left corners of every sampled block, skipping the image boundaries
+    ys = np.arange(ignoreBounds, gray.shape[0] - ignoreBounds, imageSkipSize)
+    xs = np.arange(ignoreBounds, gray.shape[1] - ignoreBounds, imageSkipSize)
+    if len(ys) == 0 or len(xs) == 0:
+        return None
 
-            # Update the darkest point if the current block is darker
-            if current_sum < min_sum and num_pixels > 0:
-                min_sum = current_sum
-                darkest_point = (x + searchArea // 2, y + searchArea // 2)  # Center of the block
+    # Sparse sample offsets inside a block (ignoreBounds >= searchArea, so blocks never run past the image)
+    offsets = np.arange(0, searchArea, internalSkipSize)
+
+    # Gather every sampled pixel at once as (block y, offset y, block x, offset x) and sum per block
+    rows = (ys[:, None] + offsets).ravel()
+    cols = (xs[:, None] + offsets).ravel()
+    samples = gray[np.ix_(rows, cols)].reshape(len(ys), len(offsets), len(xs), len(offsets))
+    block_sums = samples.sum(axis=(1, 3), dtype=np.int64)
+
+    # argmin picks the first darkest block in row-major order, same as scanning y then x
+    iy, ix = np.unravel_index(np.argmin(block_sums), block_sums.shape)
+    darkest_point = (int(xs[ix]) + searchArea // 2, int(ys[iy]) + searchArea // 2)  # Center of the block
 
     return darkest_point
 
@@ -80,9 +82,6 @@ def mask_outside_square(image, center, size):
     x, y = center
     half_size = size // 2
 
-    # Create a mask initialized to black
-    mask = np.zeros_like(image)
-
     # Calculate the top-left corner of the square
     top_left_x = max(0, x - half_size)
     top_left_y = max(0, y - half_size)
@@ -91,11 +90,9 @@ def mask_outside_square(image, center, size):
     bottom_right_x = min(image.shape[1], x + half_size)
     bottom_right_y = min(image.shape[0], y + half_size)
 
-    # Set the square area in the mask to white
-    mask[top_left_y:bottom_right_y, top_left_x:bottom_right_x] = 255
-
-    # Apply the mask to the image
-    masked_image = cv2.bitwise_and(image, mask)
+    # Copy the square into a black image rather than building a full-frame mask and ANDing it
+    masked_image = np.zeros_like(image)
+    masked_image[top_left_y:bottom_right_y, top_left_x:bottom_right_x] = image[top_left_y:bottom_right_y, top_left_x:bottom_right_x]
 
     return masked_image
    
@@ -105,49 +102,34 @@ def optimize_contours_by_angle(contours, image):
 
     # Holds the candidate points
     all_contours = np.concatenate(contours[0], axis=0)
+    num_points = len(all_contours)
 
     # Set spacing based on size of contours
-    spacing = int(len(all_contours)/25)  # Spacing between sampled points
+    spacing = int(num_points/25)  # Spacing between sampled points
 
-    # Temporary array for result
-    filtered_points = []
-    
     # Calculate centroid of the original contours
     centroid = np.mean(all_contours, axis=0)
-    
-    # Create an image of the same size as the original image
-    point_image = image.copy()
-    
-    skip = 0
-    
-    # Loop through each point in the all_contours array
-    for i in range(0, len(all_contours), 1):
-    
-        # Get three points: current point, previous point, and next point
-        current_point = all_contours[i]
-        prev_point = all_contours[i - spacing] if i - spacing >= 0 else all_contours[-spacing]
-        next_point = all_contours[i + spacing] if i + spacing < len(all_contours) else all_contours[spacing]
-        
-        # Calculate vectors between points
-        vec1 = prev_point - current_point
-        vec2 = next_point - current_point
-        
-        with np.errstate(invalid='ignore'):
-            # Calculate angles between vectors
-            angle = np.arccos(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
 
-        
-        # Calculate vector from current point to centroid
-        vec_to_centroid = centroid - current_point
-        
-        # Check if angle is oriented towards centroid
-        # Calculate the cosine of the desired angle threshold (e.g., 80 degrees)
-        cos_threshold = np.cos(np.radians(60))  # Convert angle to radians
-        
-        if np.dot(vec_to_centroid, (vec1+vec2)/2) >= cos_threshold:
-            filtered_points.append(current_point)
-    
-    return np.array(filtered_points, dtype=np.int32).reshape((-1, 1, 2))
+    # Previous and next point for every point at once (wrapping as the per-point loop did)
+    indices = np.arange(num_points)
+    prev_indices = np.where(indices - spacing >= 0, indices - spacing, num_points - spacing)
+    next_indices = np.where(indices + spacing < num_points, indices + spacing, spacing)
+
+    # Calculate vectors between points
+    vec1 = all_contours[prev_indices] - all_contours
+    vec2 = all_contours[next_indices] - all_contours
+
+    # Calculate vector from each point to centroid
+    vec_to_centroid = centroid - all_contours
+
+    # Check if angle is oriented towards centroid
+    # Calculate the cosine of the desired angle threshold (e.g., 80 degrees)
+    cos_threshold = np.cos(np.radians(60))  # Convert angle to radians
+
+    # Row-wise dot product, one pass over all points
+    keep = np.einsum('ij,ij->i', vec_to_centroid, (vec1 + vec2) / 2) >= cos_threshold
+
+    return all_contours[keep].astype(np.int32).reshape((-1, 1, 2))
 
 #returns the largest contour that is not extremely long or tall
 #contours is the list of contours, pixel_thresh is the max pixels to filter, and ratio_thresh is the max ratio
@@ -225,12 +207,12 @@ def check_contour_pixels(contour, image_shape, debug_mode_on):
     overlap_thick = cv2.bitwise_and(contour_mask, ellipse_mask_thick)
     overlap_thin = cv2.bitwise_and(contour_mask, ellipse_mask_thin)
     
-    # Count the number of non-zero (white) pixels in the overlap
-    absolute_pixel_total_thick = np.sum(overlap_thick > 0)#compute with thicker border
-    absolute_pixel_total_thin = np.sum(overlap_thin > 0)#compute with thicker border
+    # Count the number of non-zero (white) pixels in the overlap (countNonZero avoids a temporary bool image)
+    absolute_pixel_total_thick = cv2.countNonZero(overlap_thick)#compute with thicker border
+    absolute_pixel_total_thin = cv2.countNonZero(overlap_thin)#compute with thicker border
     
     # Compute the ratio of pixels under the ellipse to the total pixels on the contour border
-    total_border_pixels = np.sum(contour_mask > 0)
+    total_border_pixels = cv2.countNonZero(contour_mask)
     
     ratio_under_ellipse = absolute_pixel_total_thin / total_border_pixels if total_border_pixels > 0 else 0
     
@@ -254,11 +236,11 @@ def check_ellipse_goodness(binary_image, contour, debug_mode_on):
     # Draw the ellipse on the mask with white color (255)
     cv2.ellipse(mask, ellipse, (255), -1)
     
-    # Calculate the number of pixels within the ellipse
-    ellipse_area = np.sum(mask == 255)
+    # Calculate the number of pixels within the ellipse (mask is only 0 or 255)
+    ellipse_area = cv2.countNonZero(mask)
     
-    # Calculate the number of white pixels within the ellipse
-    covered_pixels = np.sum((binary_image == 255) & (mask == 255))
+    # Calculate the number of white pixels within the ellipse (binary_image is thresholded to 0 or 255)
+    covered_pixels = cv2.countNonZero(cv2.bitwise_and(binary_image, mask))
     
     # Calculate the percentage of covered white pixels within the ellipse
     if ellipse_area == 0:
@@ -289,10 +271,8 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
     best_array = 0 
     kernel_size = 5  # Size of the kernel (5x5)
     kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    gray_copy1 = gray_frame.copy()
-    gray_copy2 = gray_frame.copy()
-    gray_copy3 = gray_frame.copy()
-    gray_copies = [gray_copy1, gray_copy2, gray_copy3]
+    # Annotated copies are only ever shown in debug mode, so don't make them otherwise
+    gray_copies = [gray_frame.copy() for _ in range(3)] if debug_mode_on else None
     final_goodness = 0
     
     #iterate through binary images and see which fits the ellipse best
@@ -303,8 +283,6 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
         # Find contours
         contours, hierarchy = cv2.findContours(dilated_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-        # Create an empty image to draw contours
-        contour_img2 = np.zeros_like(dilated_image)
         reduced_contours = filter_contours_by_area_and_return_largest(contours, 1000, 3)
 
         if len(reduced_contours) > 0 and len(reduced_contours[0]) > 5:
@@ -318,7 +296,8 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
             #in total pixels, first element is pixel total, next is ratio
             total_pixels = check_contour_pixels(reduced_contours[0], dilated_image.shape, debug_mode_on)                 
             
-            cv2.ellipse(gray_copies[i-1], ellipse, (255, 0, 0), 2)  # Draw with specified color and thickness of 2
+            if debug_mode_on:
+                cv2.ellipse(gray_copies[i-1], ellipse, (255, 0, 0), 2)  # Draw with specified color and thickness of 2
             font = cv2.FONT_HERSHEY_SIMPLEX  # Font type
             
             final_goodness = current_goodness[0]*total_pixels[0]*total_pixels[0]*total_pixels[1]
@@ -361,9 +340,6 @@ def process_frames(thresholded_image_strict, thresholded_image_medium, threshold
     if render_cv_window:
         cv2.imshow('best_thresholded_image_contours_on_frame', test_frame)
     
-    # Create an empty image to draw contours
-    contour_img3 = np.zeros_like(image_array[i-1])
-    
     if len(final_contours[0]) >= 5:
         contour = np.array(final_contours[0], dtype=np.int32).reshape((-1, 1, 2)) #format for cv2.fitEllipse
         ellipse = cv2.fitEllipse(contour) # Fit ellipse
@@ -379,11 +355,12 @@ def process_frame(frame):
     # Crop and resize frame
     frame = crop_to_aspect_ratio(frame)
 
+    # Convert to grayscale once, used for both the darkest point search and thresholding
+    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
     #find the darkest point
-    darkest_point = get_darkest_area(frame)
+    darkest_point = get_darkest_area(gray_frame)
 
-    # Convert to grayscale to handle pixel value operations
-    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     darkest_pixel_value = gray_frame[darkest_point[1], darkest_point[0]]
     
     # apply thresholding operations at different levels
@@ -402,14 +379,20 @@ def process_frame(frame):
     
     return final_rotated_rect
 
+# Opens a video file with the FFmpeg backend, asking for hardware-accelerated decoding
+# when this OpenCV build supports it; falls back to the default backend otherwise
+def open_video_file(video_path):
+    if hasattr(cv2, "VIDEO_ACCELERATION_ANY"):
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap.isOpened():
+            return cap
+    return cv2.VideoCapture(video_path)
+
 # Loads a video and finds the pupil in each frame
 def process_video(video_path, input_method):
 
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec for MP4 format
-    out = cv2.VideoWriter('C:/Storage/Source Videos/output_video.mp4', fourcc, 30.0, (640, 480))  # Output video filename, codec, frame rate, and frame size
-
     if input_method == 1:
-        cap = cv2.VideoCapture(video_path)
+        cap = open_video_file(video_path)
     elif input_method == 2:
         cap = cv2.VideoCapture(00, cv2.CAP_DSHOW)  # Camera input
         cap.set(cv2.CAP_PROP_EXPOSURE, -5)
@@ -433,16 +416,17 @@ def process_video(video_path, input_method):
         # Crop and resize frame
         frame = crop_to_aspect_ratio(frame)
 
+        # Convert to grayscale once, used for both the darkest point search and thresholding
+        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
         #find the darkest point
-        darkest_point = get_darkest_area(frame)
+        darkest_point = get_darkest_area(gray_frame)
 
         if debug_mode_on:
             darkest_image = frame.copy()
             cv2.circle(darkest_image, darkest_point, 10, (0, 0, 255), -1)
             cv2.imshow('Darkest image patch', darkest_image)
 
-        # Convert to grayscale to handle pixel value operations
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         darkest_pixel_value = gray_frame[darkest_point[1], darkest_point[0]]
         
         # apply thresholding operations at different levels
@@ -467,7 +451,6 @@ def process_video(video_path, input_method):
             debug_mode_on = False
             cv2.destroyAllWindows()
         if key == ord('q'):  # Press 'q' to quit
-            out.release()
             break   
         elif key == ord(' '):  # Press spacebar to start/stop
             while True:
@@ -478,7 +461,6 @@ def process_video(video_path, input_method):
                     break
 
     cap.release()
-    out.release()
     cv2.destroyAllWindows()
 
 #Prompts the user to select a video file if the hardcoded path is not found
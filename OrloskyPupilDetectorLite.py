@@ -7,6 +7,11 @@ from tkinter import filedialog
 # Crop the image to maintain a specific aspect ratio (width:height) before resizing.
 def crop_to_aspect_ratio(image, width=640, height=480):
     current_height, current_width = image.shape[:2]
+
+    # Camera already delivers the target size, so there is nothing to crop or resample
+    if current_width == width and current_height == height:
+        return image
+
     desired_ratio = width / height
     current_ratio = current_width / current_height
 
@@ -36,26 +41,27 @@ def get_darkest_area(image):
     searchArea = 20
     internalSkipSize = 5
 
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    min_sum = float('inf')
-    darkest_point = None
-
-    for y in range(ignoreBounds, gray.shape[0] - ignoreBounds, imageSkipSize):
-        for x in range(ignoreBounds, gray.shape[1] - ignoreBounds, imageSkipSize):
-            current_sum = 0
-            num_pixels = 0
-            for dy in range(0, searchArea, internalSkipSize):
-                if y + dy >= gray.shape[0]:
-                    break
-                for dx in range(0, searchArea, internalSkipSize):
-                    if x + dx >= gray.shape[1]:
-                        break
-                    current_sum += gray[y + dy][x + dx]
-                    num_pixels += 1
-
-            if current_sum < min_sum and num_pixels > 0:
-                min_sum = current_sum
-                darkest_point = (x + searchArea // 2, y + searchArea // 2)
+    # (callers that already converted the frame can pass the gray image directly)
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Top-left corners of every sampled block, skipping the image boundaries
+    ys = np.arange(ignoreBounds, gray.shape[0] - ignoreBounds, imageSkipSize)
+    xs = np.arange(ignoreBounds, gray.shape[1] - ignoreBounds, imageSkipSize)
+    if len(ys) == 0 or len(xs) == 0:
+        return None
+
+    # Sparse sample offsets inside a block (ignoreBounds >= searchArea, so blocks never run past the image)
+    offsets = np.arange(0, searchArea, internalSkipSize)
+
+    # Gather every sampled pixel at once as (block y, offset y, block x, offset x) and sum per block
+    rows = (ys[:, None] + offsets).ravel()
+    cols = (xs[:, None] + offsets).ravel()
+    samples = gray[np.ix_(rows, cols)].reshape(len(ys), len(offsets), len(xs), len(offsets))
+    block_sums = samples.sum(axis=(1, 3), dtype=np.int64)
+
+    # argmin picks the first darkest block in row-major order, same as scanning y then x
+    iy, ix = np.unravel_index(np.argmin(block_sums), block_sums.shape)
+    darkest_point = (int(xs[ix]) + searchArea // 2, int(ys[iy]) + searchArea // 2)  # Center of the block
 
     return darkest_point
 
@@ -64,13 +70,15 @@ def mask_outside_square(image, center, size):
     x, y = center
     half_size = size // 2
 
-    mask = np.zeros_like(image)
     top_left_x = max(0, x - half_size)
     top_left_y = max(0, y - half_size)
     bottom_right_x = min(image.shape[1], x + half_size)
     bottom_right_y = min(image.shape[0], y + half_size)
-    mask[top_left_y:bottom_right_y, top_left_x:bottom_right_x] = 255
-    return cv2.bitwise_and(image, mask)
+
+    # Copy the square into a black image rather than building a full-frame mask and ANDing it
+    masked_image = np.zeros_like(image)
+    masked_image[top_left_y:bottom_right_y, top_left_x:bottom_right_x] = image[top_left_y:bottom_right_y, top_left_x:bottom_right_x]
+    return masked_image
 
 # Returns the largest contour that is not extremely long or tall
 def filter_contours_by_area_and_return_largest(contours, pixel_thresh, ratio_thresh):
@@ -116,19 +124,25 @@ def process_frames(thresholded_image_medium, frame, gray_frame, darkest_point, d
 # Process a single frame for pupil detection
 def process_frame(frame):
     frame = crop_to_aspect_ratio(frame)
-    darkest_point = get_darkest_area(frame)
     gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    darkest_point = get_darkest_area(gray_frame)
     darkest_pixel_value = gray_frame[darkest_point[1], darkest_point[0]]
     thresholded_image_medium = apply_binary_threshold(gray_frame, darkest_pixel_value, 15)
     thresholded_image_medium = mask_outside_square(thresholded_image_medium, darkest_point, 250)
     return process_frames(thresholded_image_medium, frame, gray_frame, darkest_point, False, False)
 
+# Opens a video file with the FFmpeg backend, asking for hardware-accelerated decoding
+# when this OpenCV build supports it; falls back to the default backend otherwise
+def open_video_file(video_path):
+    if hasattr(cv2, "VIDEO_ACCELERATION_ANY"):
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap.isOpened():
+            return cap
+    return cv2.VideoCapture(video_path)
+
 # Process video frames for pupil detection
 def process_video(video_path, input_method):
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter('output_video.mp4', fourcc, 30.0, (640, 480))
-
-    cap = cv2.VideoCapture(video_path) if input_method == 1 else cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    cap = open_video_file(video_path) if input_method == 1 else cv2.VideoCapture(0, cv2.CAP_DSHOW)
 
     if not cap.isOpened():
         print("Error: Could not open video.")
@@ -148,7 +162,6 @@ def process_video(video_path, input_method):
             cv2.waitKey(0)
 
     cap.release()
-    out.release()
     cv2.destroyAllWindows()
 
 # Prompt user to select a video file
@@ -18,15 +18,47 @@ mouse_control_enabled = False
 filter_length = 10
 gaze_length = 350
 
+# Degrees at which the screen border will be reached
+YAW_DEGREES = 5 * 3  # x degrees left or right
+PITCH_DEGREES = 2.0 * 2.5  # x degrees up or down
+
+# Pixels per degree, fixed for the session so computed once
+SCREEN_SCALE_X = MONITOR_WIDTH / (2 * YAW_DEGREES)
+SCREEN_SCALE_Y = MONITOR_HEIGHT / (2 * PITCH_DEGREES)
+
+# Edges connecting the head cube corners, constant so built once
+CUBE_EDGES = (
+    (0, 1), (1, 3), (3, 2), (2, 0),
+    (4, 5), (5, 7), (7, 6), (6, 4),
+    (0, 4), (1, 5), (2, 6), (3, 7)
+)
+
+# Key command help text drawn in the lower-left of the debug view
+DEBUG_HELP_TEXT = (
+    "C = calibrate screen center",
+    "J = yaw left",
+    "L = yaw right",
+    "I = pitch up",
+    "K = pitch down",
+    "[ = zoom out",
+    "] = zoom in",
+    "R = reset view",
+    "X = add marker",
+    "q = quit",
+    "F7 = toggle mouse control"
+)
+
 # --- Orbit camera state for the debug view ---
 orbit_yaw   = -151.0          # radians, left/right
 orbit_pitch = 00.0          # radians, up/down
 orbit_radius = 1500.0       # distance from head center
 orbit_fov_deg = 50.0       # horizontal FOV for projection
+print_orbit_debug = False  # per-frame orbit state console output while a key is held, enable only when debugging
 
 # --- Debug-view world freeze (pivot fixed after center calibration) ---
 debug_world_frozen = False
 orbit_pivot_frozen = None  # world-space point the debug camera orbits (monitor center at calib)
+debug_canvas = None  # reused debug view image, only reallocated when the size changes
 
 # Stored gaze markers on the monitor plane (as (a,b) in plane coords)
 # a = 0..1 across width (p0->p1), b = 0..1 down height (p0->p3)
@@ -83,10 +115,30 @@ nose_indices = [4, 45, 275, 220, 440, 1, 5, 51, 281, 44, 274, 241,
 # ===== NEW: File writing for screen position =====
 screen_position_file = "C:/Storage/Google Drive/Software/EyeTracker3DPython/screen_position.txt"
 
+# Latest position handed to the writer thread (only the newest value matters)
+screen_position_latest = None
+screen_position_lock = threading.Lock()
+screen_position_ready = threading.Event()
+
 def write_screen_position(x, y):
-    """Write screen position to file, overwriting the same line"""
-    with open(screen_position_file, 'w') as f:
-        f.write(f"{x},{y}\n")
+    """Hand the screen position to the writer thread so file I/O stays off the frame loop"""
+    global screen_position_latest
+    with screen_position_lock:
+        screen_position_latest = (x, y)
+    screen_position_ready.set()
+
+def screen_position_writer():
+    """Writer thread: write the latest screen position to file, overwriting the same line"""
+    while True:
+        screen_position_ready.wait()
+        screen_position_ready.clear()
+        with screen_position_lock:
+            x, y = screen_position_latest
+        try:
+            with open(screen_position_file, 'w') as f:
+                f.write(f"{x},{y}\n")
+        except OSError as e:
+            print("Write error:", e)
 
 def _rot_x(a):
     ca, sa = math.cos(a), math.sin(a)
@@ -179,7 +231,7 @@ def create_monitor_plane(head_center, R_final, face_landmarks, w, h,
 
 
 def update_orbit_from_keys():
-    """Keyboard orbit controls that PRINT every frame while a key is held."""
+    """Keyboard orbit controls, printing the orbit state every frame while a key is held if print_orbit_debug is set."""
     global orbit_yaw, orbit_pitch, orbit_radius
     yaw_step   = math.radians(1.5)
     pitch_step = math.radians(1.5)
@@ -203,7 +255,7 @@ def update_orbit_from_keys():
     if keyboard.is_pressed(']'):  # zoom in
         orbit_radius = max(80.0, orbit_radius - zoom_step); changed = True
 
-    # Reset (prints every frame while held)
+    # Reset
     if keyboard.is_pressed('r'):
         orbit_yaw = 0.0
         orbit_pitch = 0.0
@@ -214,7 +266,7 @@ def update_orbit_from_keys():
     orbit_pitch = max(math.radians(-89), min(math.radians(89), orbit_pitch))
     orbit_radius = max(80.0, orbit_radius)
 
-    if changed:
+    if changed and print_orbit_debug:
         print(f"[Orbit Debug] yaw={math.degrees(orbit_yaw):.2f}°, "
               f"pitch={math.degrees(orbit_pitch):.2f}°, "
               f"radius={orbit_radius:.2f}, "
@@ -225,15 +277,12 @@ def update_orbit_from_keys():
 
 def compute_scale(points_3d):
     # Use average pairwise distance for robustness
-    n = len(points_3d)
-    total = 0
-    count = 0
-    for i in range(n):
-        for j in range(i + 1, n):
-            dist = np.linalg.norm(points_3d[i] - points_3d[j])
-            total += dist
-            count += 1
-    return total / count if count > 0 else 1.0
+    # (all i < j pairs at once instead of a nested Python loop)
+    points_3d = np.asarray(points_3d, dtype=float)
+    i, j = np.triu_indices(len(points_3d), k=1)
+    if len(i) == 0:
+        return 1.0
+    return np.linalg.norm(points_3d[i] - points_3d[j], axis=1).mean()
 
 def draw_gaze(frame, eye_center, iris_center, eye_radius, color, gaze_length):
     # Gaze vector
@@ -297,12 +346,7 @@ def draw_wireframe_cube(frame, center, R, size=80):
     projected = [(int(pt[0]), int(pt[1])) for pt in corners]
 
     # Edges connecting the corners
-    edges = [
-        (0, 1), (1, 3), (3, 2), (2, 0),
-        (4, 5), (5, 7), (7, 6), (6, 4),
-        (0, 4), (1, 5), (2, 6), (3, 7)
-    ]
-    for i, j in edges:
+    for i, j in CUBE_EDGES:
         cv2.line(frame, projected[i], projected[j], (255, 128, 0), 2)
 
 def compute_and_draw_coordinate_box(frame, face_landmarks, indices, ref_matrix_container, color=(0, 255, 0), size=80):
@@ -374,14 +418,14 @@ def convert_gaze_to_screen_coordinates(combined_gaze_direction, calibration_offs
     # Horizontal (yaw) angle from reference (project onto XZ plane)
     xz_proj = np.array([avg_direction[0], 0, avg_direction[2]])
     xz_proj /= np.linalg.norm(xz_proj)
-    yaw_rad = math.acos(np.clip(np.dot(reference_forward, xz_proj), -1.0, 1.0))
+    yaw_rad = math.acos(max(-1.0, min(1.0, np.dot(reference_forward, xz_proj))))
     if avg_direction[0] < 0:
         yaw_rad = -yaw_rad  # left is negative
 
     # Vertical (pitch) angle from reference (project onto YZ plane)
     yz_proj = np.array([0, avg_direction[1], avg_direction[2]])
     yz_proj /= np.linalg.norm(yz_proj)
-    pitch_rad = math.acos(np.clip(np.dot(reference_forward, yz_proj), -1.0, 1.0))
+    pitch_rad = math.acos(max(-1.0, min(1.0, np.dot(reference_forward, yz_proj))))
     if avg_direction[1] > 0:
         pitch_rad = -pitch_rad  # up is positive
 
@@ -401,18 +445,14 @@ def convert_gaze_to_screen_coordinates(combined_gaze_direction, calibration_offs
     raw_yaw_deg = yaw_deg
     raw_pitch_deg = pitch_deg
 
-    
-    # Specify degrees at which screen border will be reached
-    yawDegrees = 5 * 3  # x degrees left or right
-    pitchDegrees = 2.0 * 2.5  # x degrees up or down
 
     # Apply calibration offsets
     yaw_deg += calibration_offset_yaw
     pitch_deg += calibration_offset_pitch
 
     # Map to full screen resolution
-    screen_x = int(((yaw_deg + yawDegrees) / (2 * yawDegrees)) * MONITOR_WIDTH)
-    screen_y = int(((pitchDegrees - pitch_deg) / (2 * pitchDegrees)) * MONITOR_HEIGHT)
+    screen_x = int((yaw_deg + YAW_DEGREES) * SCREEN_SCALE_X)
+    screen_y = int((PITCH_DEGREES - pitch_deg) * SCREEN_SCALE_Y)
 
     # Clamp screen position to monitor bounds
     screen_x = max(10, min(screen_x, MONITOR_WIDTH - 10))
@@ -438,7 +478,13 @@ def render_debug_view_orbit(
     if head_center3d is None:
         return
 
-    debug = np.zeros((h, w, 3), dtype=np.uint8)
+    # Reuse the canvas between frames instead of allocating a new one
+    global debug_canvas
+    if debug_canvas is None or debug_canvas.shape[:2] != (h, w):
+        debug_canvas = np.zeros((h, w, 3), dtype=np.uint8)
+    else:
+        debug_canvas.fill(0)
+    debug = debug_canvas
 
     # --- Choose orbit pivot ---
     head_w = np.asarray(head_center3d, dtype=float)
@@ -507,11 +553,17 @@ def render_debug_view_orbit(
             cv2.line(debug, p1, a2, color, thickness)
 
     # --- Landmarks ---
-    if landmarks3d is not None:
-        for P in landmarks3d:
-            res = project_point(P)
-            if res is not None:
-                cv2.circle(debug, res[0], 0, (200, 200, 200), -1)
+    # Same projection as project_point, done for all landmarks in one matrix multiply
+    if landmarks3d is not None and len(landmarks3d) > 0:
+        Pc = (np.asarray(landmarks3d, dtype=float) - cam_pos) @ V.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xs = f_px * (Pc[:, 0] / Pc[:, 2]) + w * 0.5
+            ys = -f_px * (Pc[:, 1] / Pc[:, 2]) + h * 0.5
+        valid = (Pc[:, 2] > 1e-3) & np.isfinite(xs) & np.isfinite(ys)
+        xs = xs[valid].astype(np.int64)
+        ys = ys[valid].astype(np.int64)
+        on_canvas = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        debug[ys[on_canvas], xs[on_canvas]] = (200, 200, 200)
 
     # --- Head center ---
     draw_cross_3d(head_w, size=12, color=(255, 0, 255), thickness=2)
@@ -665,19 +717,7 @@ def render_debug_view_orbit(
 
 
     # --- Key command help text in lower-left ---
-    help_text = [
-        "C = calibrate screen center",
-        "J = yaw left",
-        "L = yaw right",
-        "I = pitch up",
-        "K = pitch down",
-        "[ = zoom out",
-        "] = zoom in",
-        "R = reset view",
-        "X = add marker",
-        "q = quit",
-        "F7 = toggle mouse control"
-    ]
+    help_text = DEBUG_HELP_TEXT
 
     font        = cv2.FONT_HERSHEY_SIMPLEX
     font_scale  = 0.5
@@ -703,12 +743,28 @@ def mouse_mover():
         if mouse_control_enabled:
             with mouse_lock:
                 x, y = mouse_target
-            pyautogui.moveTo(x, y)
+            # Only call moveTo when the cursor is not already at the target; comparing against the
+            # real cursor position (not the last target sent) also re-applies the target after
+            # F7 re-enables control or the mouse was moved by hand
+            if tuple(pyautogui.position()) != (x, y):
+                pyautogui.moveTo(x, y)
         time.sleep(0.01)  # adjust for responsiveness
 
+def toggle_mouse_control():
+    """F7 hotkey callback, runs on the keyboard hook thread instead of polling every frame"""
+    global mouse_control_enabled
+    mouse_control_enabled = not mouse_control_enabled
+    print(f"[Mouse Control] {'Enabled' if mouse_control_enabled else 'Disabled'}")
+
 # Start mouse movement thread
 threading.Thread(target=mouse_mover, daemon=True).start()
 
+# Toggle mouse control once per F7 press (fires on release, so holding the key does not repeat)
+keyboard.add_hotkey('f7', toggle_mouse_control, trigger_on_release=True)
+
+# Start screen position writer thread
+threading.Thread(target=screen_position_writer, daemon=True).start()
+
 # Eye sphere tracking variables (from new script)
 left_sphere_locked = False
 left_sphere_local_offset = None
@@ -747,6 +803,9 @@ while cap.isOpened():
             size=80
         )
 
+        # Head scale for this frame, shared by both eyes and the calibrate/marker keys below
+        current_nose_scale = compute_scale(nose_points_3d)
+
         # TODO compute this radius using canthus during calibration
         base_radius = 20  # radius at calibration distance
 
@@ -756,7 +815,6 @@ while cap.isOpened():
         if not left_sphere_locked:
             cv2.circle(frame, (x_iris_l, y_iris_l), 10, (255, 25, 25), 2)
         else:
-            current_nose_scale = compute_scale(nose_points_3d)
             scale_ratio = current_nose_scale / left_calibration_nose_scale if left_calibration_nose_scale else 1.0
             scaled_offset = left_sphere_local_offset * scale_ratio
             sphere_world_l = head_center + R_final @ scaled_offset
@@ -770,7 +828,6 @@ while cap.isOpened():
         if not right_sphere_locked:
             cv2.circle(frame, (x_iris_r, y_iris_r), 10, (25, 255, 25), 2)
         else:
-            current_nose_scale = compute_scale(nose_points_3d)
             scale_ratio_r = current_nose_scale / right_calibration_nose_scale if right_calibration_nose_scale else 1.0
             scaled_offset_r = right_sphere_local_offset * scale_ratio_r
             sphere_world_r = head_center + R_final @ scaled_offset_r
@@ -852,20 +909,18 @@ while cap.isOpened():
                 color = (0, 255, 0) if "Mouse: ON" not in text else (0, 255, 0) if mouse_control_enabled else (0, 0, 255)
                 cv2.putText(frame, text, (center_x, 30), font, font_scale, color, thickness)
 
-        # Draw all landmark points in white
-        for idx, lm in enumerate(face_landmarks):
-            x, y = int(lm.x * w), int(lm.y * h)
-            cv2.circle(frame, (x, y), 0, (255, 255, 255), -1)
+        # Build 3D landmarks in your existing scale (x*w, y*h, z*w)
+        landmarks3d = np.array([[p.x * w, p.y * h, p.z * w] for p in face_landmarks], dtype=float)
+
+        # Draw all landmark points in white (pixel coords converted to int once for the whole set)
+        landmarks2d = landmarks3d[:, :2].astype(np.int32)
+        visible = ((landmarks2d[:, 0] >= 0) & (landmarks2d[:, 0] < w) &
+                   (landmarks2d[:, 1] >= 0) & (landmarks2d[:, 1] < h))
+        frame[landmarks2d[visible, 1], landmarks2d[visible, 0]] = (255, 255, 255)
 
         # Smooth orbit controls each frame
         update_orbit_from_keys()
 
-        # Build 3D landmarks in your existing scale (x*w, y*h, z*w)
-        landmarks3d = None
-        if results.multi_face_landmarks:
-            lm = results.multi_face_landmarks[0].landmark
-            landmarks3d = np.array([[p.x * w, p.y * h, p.z * w] for p in lm], dtype=float)
-
         render_debug_view_orbit(
             h, w,
             head_center3d=head_center if 'head_center' in locals() else None,
@@ -890,16 +945,10 @@ while cap.isOpened():
     cv2.imshow("Integrated Eye Tracking", frame)
 
     # Handle keyboard input
-    if keyboard.is_pressed('f7'):
-        mouse_control_enabled = not mouse_control_enabled
-        print(f"[Mouse Control] {'Enabled' if mouse_control_enabled else 'Disabled'}")
-        time.sleep(0.3)  # debounce to prevent rapid toggling
-
     key = cv2.waitKey(1) & 0xFF
     if key == ord('q'):
         break
     elif key == ord('c') and not (left_sphere_locked and right_sphere_locked):
-        current_nose_scale = compute_scale(nose_points_3d)
         # Lock LEFT eye
         left_sphere_local_offset = R_final.T @ (iris_3d_left - head_center)
         camera_dir_world = np.array([0, 0, 1])
@@ -975,8 +1024,7 @@ while cap.isOpened():
         # Drop a marker at the current gaze∩monitor point
         if (monitor_corners is not None and monitor_center_w is not None and monitor_normal_w is not None
             and left_sphere_locked and right_sphere_locked):
-            # Recompute current eye-sphere positions (scale-aware)
-            current_nose_scale = compute_scale(nose_points_3d)
+            # Recompute current eye-sphere positions (scale-aware, using this frame's head scale)
             scale_ratio_l = current_nose_scale / left_calibration_nose_scale if left_calibration_nose_scale else 1.0
             scale_ratio_r = current_nose_scale / right_calibration_nose_scale if right_calibration_nose_scale else 1.0
             sphere_world_l_now = head_center + R_final @ (left_sphere_local_offset * scale_ratio_l)